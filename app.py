@@ -2,11 +2,14 @@ import os
 import logging
 from flask import Flask, render_template, request, jsonify
 from astropy import units as u
+from astropy.time import Time
+from astropy.coordinates import SkyCoord
 import pandas as pd
 
 from config import Config
 from correlator import Correlator
 from data_handler.mock_fetcher import MockFetcher
+from event_index import EventIndex
 from visualization.all_sky import plot_on_healpix 
 from visualization.detail_plot import plot_correlation_heatmap
 
@@ -17,6 +20,11 @@ if not os.path.exists('static/plots'):
     
 logging.basicConfig(level=logging.INFO)
 
+# Optional prebuilt archive index (see event_index.py). It is memory-mapped
+# read-only, so all gunicorn workers share one copy through the page cache.
+EVENT_INDEX_PATH = os.environ.get('MMA_EVENT_INDEX')
+event_index = EventIndex.load(EVENT_INDEX_PATH) if EVENT_INDEX_PATH else None
+
 @app.route('/')
 def index():
     """Serves the main HTML page."""
@@ -90,5 +98,60 @@ def run_correlation():
         logging.error(f"An error occurred: {e}", exc_info=True)
         return jsonify({"success": False, "error": str(e)}), 500
 
+@app.route('/query', methods=['POST'])
+def query_archive():
+    """API endpoint to correlate a small set of events against the shared archive index."""
+    if event_index is None:
+        return jsonify({"success": False, "error": "No event index loaded (set MMA_EVENT_INDEX)."}), 503
+    try:
+        data = request.json
+        time_window = float(data.get('timeWindow', 1.0))
+        angle_sep = float(data.get('angleSep', 1.0))
+        app_config = Config(
+            TIME_WINDOW=time_window * u.day,
+            ANGULAR_SEPARATION=angle_sep * u.deg,
+            HEALPIX_NSIDE=event_index.nside
+        )
+
+        events_df = pd.DataFrame([{
+            'event_id': str(e['event_id']),
+            'source': e['source'],
+            'astropy_time': Time(e['time']),
+            'astropy_coord': SkyCoord(ra=float(e['ra']) * u.deg, dec=float(e['dec']) * u.deg, frame='icrs')
+        } for e in data.get('events', [])])
+        if events_df.empty:
+            return jsonify({"success": True, "correlations": []})
+
+        # Pairs against the archive, plus pairs within the submitted events.
+        results = []
+        for pair in event_index.query(events_df, app_config):
+            event1 = events_df.loc[pair['query_idx']]
+            event2 = event_index.get_event(pair['archive_idx'])
+            results.append((pair, event1, event2))
+
+        correlator_instance = Correlator(events_df, app_config)
+        for pair in correlator_instance.find_correlations():
+            event1 = correlator_instance.events_df.loc[pair['event1_idx']]
+            event2 = correlator_instance.events_df.loc[pair['event2_idx']]
+            results.append((pair, event1, event2))
+
+        results.sort(key=lambda r: r[0]['probability'], reverse=True)
+        return jsonify({
+            "success": True,
+            "correlations": [{
+                "probability": f"{pair['probability']:.2%}",
+                "event1_id": event1['event_id'],
+                "event1_source": event1['source'],
+                "event2_id": event2['event_id'],
+                "event2_source": event2['source'],
+                "time_sep_hrs": f"{pair['time_sep_days'] * 24:.2f}",
+                "ang_sep_deg": f"{pair['ang_sep_deg']:.3f}"
+            } for pair, event1, event2 in results]
+        })
+
+    except Exception as e:
+        logging.error(f"An error occurred: {e}", exc_info=True)
+        return jsonify({"success": False, "error": str(e)}), 500
+
 if __name__ == '__main__':
     app.run(debug=True)
\ No newline at end of file
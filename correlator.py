@@ -11,6 +11,7 @@ from astropy import units as u
 from config import Config
 from utils import calculate_correlation_probability
 from analysis.contextual import get_context_from_catalogs
+from event_index import EventIndex
 
 class Correlator:
     """Finds spatio-temporal correlations in a combined event DataFrame."""
@@ -41,6 +42,10 @@ class Correlator:
         )
         return df.sort_values('astropy_time').reset_index(drop=True)
 
+    def build_index(self) -> EventIndex:
+        """Builds a read-only, memory-mappable index of the prepared events."""
+        return EventIndex.from_events(self.events_df, self.config.HEALPIX_NSIDE)
+
     def find_correlations(self) -> List[Dict]:
         """Finds correlations using a spatially-indexed (HEALPix) approach."""
         # ... (The find_correlations_optimized method from the previous version goes here) ...
@@ -0,0 +1,210 @@
+import os
+import json
+import logging
+import argparse
+from typing import List, Dict
+
+import healpy as hp
+import numpy as np
+import pandas as pd
+from astropy import units as u
+from astropy.time import Time
+from astropy.coordinates import SkyCoord
+
+from config import Config
+from utils import calculate_correlation_probability
+
+INDEX_FORMAT_VERSION = 1
+_ARRAY_NAMES = ('mjd', 'ra_deg', 'dec_deg', 'xyz', 'hpx_idx', 'pixel_offsets',
+                'source_code', 'event_id')
+
+
+def _unit_vectors(ra_deg: np.ndarray, dec_deg: np.ndarray) -> np.ndarray:
+    """Converts RA/Dec in degrees to an (n, 3) array of Cartesian unit vectors."""
+    ra, dec = np.deg2rad(ra_deg), np.deg2rad(dec_deg)
+    cos_dec = np.cos(dec)
+    return np.column_stack((cos_dec * np.cos(ra), cos_dec * np.sin(ra), np.sin(dec)))
+
+
+def _columns_from_events(df: pd.DataFrame) -> Dict[str, np.ndarray]:
+    """Extracts plain numeric columns from a standardized fetcher DataFrame."""
+    df = df[df['astropy_coord'].apply(lambda x: isinstance(x, SkyCoord))]
+    return {
+        'mjd': np.array([t.mjd for t in df['astropy_time']], dtype=np.float64),
+        'ra_deg': np.array([c.icrs.ra.deg for c in df['astropy_coord']], dtype=np.float64),
+        'dec_deg': np.array([c.icrs.dec.deg for c in df['astropy_coord']], dtype=np.float64),
+        'source': df['source'].astype(str).to_numpy(),
+        'event_id': df['event_id'].astype(str).to_numpy(),
+        'row_idx': df.index.to_numpy(),
+    }
+
+
+class EventIndex:
+    """
+    A read-only, columnar HEALPix index over an archive of events.
+
+    Events are stored sorted by (HEALPix pixel, time), so all events in a pixel
+    are the contiguous slice ``pixel_offsets[p]:pixel_offsets[p + 1]`` and can
+    be cut down to a time window with a binary search. Every array is plain
+    numpy, so a saved index can be opened with ``mmap_mode='r'`` and shared
+    zero-copy between processes (e.g. gunicorn workers) via the OS page cache.
+    """
+
+    def __init__(self, arrays: Dict[str, np.ndarray], sources: List[str], nside: int):
+        self.nside = nside
+        self.sources = list(sources)
+        self.mjd = arrays['mjd']
+        self.ra_deg = arrays['ra_deg']
+        self.dec_deg = arrays['dec_deg']
+        self.xyz = arrays['xyz']
+        self.hpx_idx = arrays['hpx_idx']
+        self.pixel_offsets = arrays['pixel_offsets']
+        self.source_code = arrays['source_code']
+        self.event_id = arrays['event_id']
+
+    def __len__(self) -> int:
+        return len(self.mjd)
+
+    @classmethod
+    def from_events(cls, events_df: pd.DataFrame, nside: int) -> "EventIndex":
+        """Builds an index from a DataFrame in the standard fetcher format."""
+        logging.info(f"Building event index for {len(events_df)} events (Nside={nside})...")
+        cols = _columns_from_events(events_df)
+
+        theta = 0.5 * np.pi - np.deg2rad(cols['dec_deg'])
+        phi = np.deg2rad(cols['ra_deg'])
+        hpx_idx = hp.ang2pix(nside, theta, phi).astype(np.int64)
+
+        # Sort by pixel first, then by time within each pixel.
+        order = np.lexsort((cols['mjd'], hpx_idx))
+        hpx_idx = hpx_idx[order]
+        counts = np.bincount(hpx_idx, minlength=hp.nside2npix(nside))
+        pixel_offsets = np.concatenate(([0], np.cumsum(counts))).astype(np.int64)
+
+        sources, source_code = np.unique(cols['source'][order], return_inverse=True)
+        event_ids = cols['event_id'][order]
+
+        arrays = {
+            'mjd': cols['mjd'][order],
+            'ra_deg': cols['ra_deg'][order],
+            'dec_deg': cols['dec_deg'][order],
+            'xyz': _unit_vectors(cols['ra_deg'][order], cols['dec_deg'][order]),
+            'hpx_idx': hpx_idx,
+            'pixel_offsets': pixel_offsets,
+            'source_code': source_code.astype(np.int16),
+            'event_id': event_ids.astype(f'U{max(1, max((len(e) for e in event_ids), default=1))}'),
+        }
+        return cls(arrays, sources.tolist(), nside)
+
+    def save(self, path: str):
+        """Writes the index to a directory of uncompressed ``.npy`` files plus metadata."""
+        os.makedirs(path, exist_ok=True)
+        for name in _ARRAY_NAMES:
+            np.save(os.path.join(path, f'{name}.npy'), np.ascontiguousarray(getattr(self, name)))
+        meta = {'version': INDEX_FORMAT_VERSION, 'nside': self.nside,
+                'sources': self.sources, 'num_events': len(self)}
+        with open(os.path.join(path, 'meta.json'), 'w') as f:
+            json.dump(meta, f)
+        logging.info(f"Saved event index with {len(self)} events to '{path}'.")
+
+    @classmethod
+    def load(cls, path: str, mmap: bool = True) -> "EventIndex":
+        """
+        Opens a saved index. With ``mmap=True`` (the default) the arrays are
+        memory-mapped read-only, so every process attaching to the same file
+        shares a single copy of the data.
+        """
+        with open(os.path.join(path, 'meta.json')) as f:
+            meta = json.load(f)
+        if meta.get('version') != INDEX_FORMAT_VERSION:
+            raise ValueError(f"Unsupported event index version {meta.get('version')} in '{path}'.")
+
+        mmap_mode = 'r' if mmap else None
+        arrays = {name: np.load(os.path.join(path, f'{name}.npy'), mmap_mode=mmap_mode)
+                  for name in _ARRAY_NAMES}
+        logging.info(f"Attached to event index '{path}' ({meta['num_events']} events, mmap={mmap}).")
+        return cls(arrays, meta['sources'], meta['nside'])
+
+    def get_event(self, idx: int) -> Dict:
+        """Returns a single archive event as a plain dictionary."""
+        return {
+            'event_id': str(self.event_id[idx]),
+            'source': self.sources[self.source_code[idx]],
+            'astropy_time': Time(self.mjd[idx], format='mjd'),
+            'astropy_coord': SkyCoord(ra=self.ra_deg[idx] * u.deg, dec=self.dec_deg[idx] * u.deg, frame='icrs'),
+        }
+
+    def query(self, events_df: pd.DataFrame, config: Config) -> List[Dict]:
+        """
+        Finds correlations between a (small) set of query events and the archive.
+
+        Each returned pair has 'query_idx' (the row label in ``events_df``),
+        'archive_idx' (the position in this index), and the same
+        'probability', 'time_sep_days' and 'ang_sep_deg' fields produced by
+        `Correlator.find_correlations`. Pairs from the same source are skipped.
+        """
+        if events_df.empty or len(self) == 0:
+            return []
+
+        cols = _columns_from_events(events_df)
+        query_xyz = _unit_vectors(cols['ra_deg'], cols['dec_deg'])
+        time_window = config.TIME_WINDOW.to(u.day).value
+        radius = config.ANGULAR_SEPARATION.to(u.rad).value
+        cos_radius = np.cos(radius)
+        source_lookup = {name: code for code, name in enumerate(self.sources)}
+
+        correlated_pairs = []
+        for i in range(len(cols['mjd'])):
+            t0 = cols['mjd'][i]
+            pixels = hp.query_disc(self.nside, query_xyz[i], radius, inclusive=True)
+            candidates = []
+            for pix in pixels:
+                start, stop = self.pixel_offsets[pix], self.pixel_offsets[pix + 1]
+                if start == stop:
+                    continue
+                times = self.mjd[start:stop]
+                lo = start + np.searchsorted(times, t0 - time_window, side='left')
+                hi = start + np.searchsorted(times, t0 + time_window, side='right')
+                if lo < hi:
+                    candidates.append(np.arange(lo, hi))
+            if not candidates:
+                continue
+
+            candidates = np.concatenate(candidates)
+            own_source = source_lookup.get(cols['source'][i])
+            if own_source is not None:
+                candidates = candidates[self.source_code[candidates] != own_source]
+            dots = self.xyz[candidates] @ query_xyz[i]
+            candidates, dots = candidates[dots >= cos_radius], dots[dots >= cos_radius]
+
+            for archive_idx, dot in zip(candidates, dots):
+                time_sep = abs(self.mjd[archive_idx] - t0) * u.day
+                ang_sep = (np.arccos(np.clip(dot, -1.0, 1.0)) * u.rad).to(u.deg)
+                prob = calculate_correlation_probability(time_sep, ang_sep, config)
+                correlated_pairs.append({
+                    'query_idx': cols['row_idx'][i], 'archive_idx': int(archive_idx),
+                    'probability': prob, 'time_sep_days': time_sep.value,
+                    'ang_sep_deg': ang_sep.value
+                })
+        return correlated_pairs
+
+
+def main():
+    """Builds a shareable event index from simulated archive data."""
+    from data_handler.mock_fetcher import MockFetcher
+
+    parser = argparse.ArgumentParser(description="Build a memory-mappable event index.")
+    parser.add_argument('output', help="Directory to write the index to.")
+    parser.add_argument('--noise-events', type=int, default=Config.NUM_NOISE_EVENTS)
+    parser.add_argument('--true-pairs', type=int, default=Config.NUM_TRUE_CORRELATIONS)
+    parser.add_argument('--nside', type=int, default=Config.HEALPIX_NSIDE)
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    config = Config(NUM_NOISE_EVENTS=args.noise_events, NUM_TRUE_CORRELATIONS=args.true_pairs,
+                    HEALPIX_NSIDE=args.nside)
+    EventIndex.from_events(MockFetcher(config).fetch(), config.HEALPIX_NSIDE).save(args.output)
+
+
+if __name__ == '__main__':
+    main()